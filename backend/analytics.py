@@ -0,0 +1,79 @@
+import numpy as np
+from typing import List
+
+from models import StatsResponse
+
+INITIAL_BALANCE = 10000  # Default starting balance for the equity curve
+
+EMPTY_STATS = StatsResponse(
+    total_trades=0,
+    win_rate=0,
+    total_profit_loss=0,
+    total_profit_loss_pct=0,
+    average_win=0,
+    average_loss=0,
+    best_trade=0,
+    worst_trade=0,
+    long_win_rate=0,
+    short_win_rate=0
+)
+
+# Trade columns gathered in one pass over the documents
+_TRADE_COLUMNS = np.dtype([('pl', np.float64), ('pl_pct', np.float64), ('side', np.int8)])
+_SIDE_CODES = {'long': 0, 'short': 1}  # anything else is side 2
+
+def compute_stats(trades: List[dict]) -> StatsResponse:
+    """Reduce closed trades to summary stats with vectorized NumPy operations"""
+    n = len(trades)
+    if n == 0:
+        return EMPTY_STATS
+
+    cols = np.fromiter(
+        (
+            (t.get('profit_loss') or 0.0, t.get('profit_loss_pct') or 0.0, _SIDE_CODES.get(t.get('direction'), 2))
+            for t in trades
+        ),
+        dtype=_TRADE_COLUMNS,
+        count=n
+    )
+    pl = cols['pl']
+    wins = pl > 0
+
+    # Bucket each trade by (side, win) so one bincount gives every win/loss
+    # count per side, and a weighted bincount gives the win and loss totals
+    counts = np.bincount(cols['side'] * 2 + wins, minlength=6)
+    loss_total, win_total = np.bincount(wins, weights=pl, minlength=2)
+
+    n_win = int(counts[1::2].sum())
+    n_loss = n - n_win
+    n_long = int(counts[0] + counts[1])
+    n_short = int(counts[2] + counts[3])
+
+    return StatsResponse(
+        total_trades=n,
+        win_rate=n_win / n * 100,
+        total_profit_loss=float(pl.sum()),
+        total_profit_loss_pct=float(cols['pl_pct'].sum()),
+        average_win=float(win_total / n_win) if n_win else 0,
+        average_loss=float(loss_total / n_loss) if n_loss else 0,
+        best_trade=float(pl.max()),
+        worst_trade=float(pl.min()),
+        long_win_rate=(int(counts[1]) / n_long * 100) if n_long else 0,
+        short_win_rate=(int(counts[3]) / n_short * 100) if n_short else 0
+    )
+
+def compute_equity_curve(trades: List[dict]) -> List[dict]:
+    """Build EquityPoint-shaped dicts from closed trades sorted by exit time"""
+    if not trades:
+        return []
+
+    pl = np.fromiter((t.get('profit_loss') or 0.0 for t in trades), dtype=np.float64, count=len(trades))
+    cum_pl = np.cumsum(pl)
+    balances = (INITIAL_BALANCE + cum_pl).tolist()
+    balance_pcts = (cum_pl * (100.0 / INITIAL_BALANCE)).tolist()
+    dates = [t['exit_time'].strftime('%Y-%m-%d') if t.get('exit_time') else '' for t in trades]
+
+    return [
+        {"date": date, "balance": balance, "balance_pct": balance_pct}
+        for date, balance, balance_pct in zip(dates, balances, balance_pcts)
+    ]
@@ -1,5 +1,7 @@
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
+from pymongo.errors import DuplicateKeyError, OperationFailure
 import os
+from datetime import timezone
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -11,20 +13,58 @@ db_name = os.environ['DB_NAME']
 
 client: AsyncIOMotorClient = None
 database: AsyncIOMotorDatabase = None
+screenshots: AsyncIOMotorGridFSBucket = None
 
 async def connect_to_mongo():
-    global client, database
-    client = AsyncIOMotorClient(mongo_url)
+    global client, database, screenshots
+    client = AsyncIOMotorClient(
+        mongo_url,
+        maxPoolSize=50,
+        minPoolSize=10,
+        # zstd when the server supports it, zlib otherwise
+        compressors="zstd,zlib",
+        zlibCompressionLevel=-1,
+        serverSelectionTimeoutMS=3000,
+        connectTimeoutMS=3000,
+        # Dates are stored natively; decode them as aware UTC so responses
+        # keep their +00:00 offset
+        tz_aware=True,
+        tzinfo=timezone.utc
+    )
     database = client[db_name]
+    screenshots = AsyncIOMotorGridFSBucket(database, bucket_name="screenshots")
     
     # Create indexes
     await database.users.create_index("email", unique=True)
-    await database.trades.create_index("user_id")
+    await database.users.create_index("id", unique=True)
+    await database.trades.create_index([("user_id", 1), ("entry_time", -1), ("id", -1)])
+    await database.trades.create_index([("user_id", 1), ("exit_time", 1), ("exit_price", 1)])
     await database.trades.create_index("entry_time")
     await database.economic_events.create_index("timestamp")
-    await database.economic_events.create_index("impact_level")
+    await database.economic_events.create_index([("impact_level", 1), ("timestamp", 1), ("event_name", 1)])
+    try:
+        await database.economic_events.create_index(
+            [("event_name", 1), ("timestamp", 1), ("country", 1)], unique=True
+        )
+    except DuplicateKeyError:
+        # Older deployments stored each sync again; run migrate_dates.py to
+        # dedupe them. Until then syncs still upsert, just without the index
+        print("Skipped unique economic_events index: duplicate events found, run migrate_dates.py")
+    
+    # Single-field indexes superseded by the compound indexes above
+    await _drop_index_if_exists(database.trades, "user_id_1")
+    await _drop_index_if_exists(database.economic_events, "impact_level_1")
     print("Connected to MongoDB")
 
+async def _drop_index_if_exists(collection, name: str):
+    # Drop directly rather than check first: workers starting together would
+    # otherwise race, and the loser's drop fails with IndexNotFound
+    try:
+        await collection.drop_index(name)
+    except OperationFailure as e:
+        if e.code != 27:  # IndexNotFound
+            raise
+
 async def close_mongo_connection():
     global client
     if client:
@@ -32,4 +72,7 @@ async def close_mongo_connection():
         print("Closed MongoDB connection")
 
 async def get_database() -> AsyncIOMotorDatabase:
-    return database
\ No newline at end of file
+    return database
+
+async def get_screenshot_bucket() -> AsyncIOMotorGridFSBucket:
+    return screenshots
\ No newline at end of file
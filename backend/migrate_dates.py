@@ -0,0 +1,70 @@
+"""One-shot migration: convert ISO-string datetimes to native BSON Dates and
+drop duplicate economic events.
+
+Run once against an existing database before deploying the server version
+that stores datetimes natively. It must run before that server starts: the
+server creates a unique (event_name, timestamp, country) index, which cannot
+be built while earlier syncs' duplicate events remain:
+
+    python migrate_dates.py
+"""
+import asyncio
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+mongo_url = os.environ['MONGO_URL']
+db_name = os.environ['DB_NAME']
+
+# collection -> datetime fields previously stored as ISO strings
+DATE_FIELDS = {
+    "trades": ["entry_time", "exit_time", "created_at"],
+    "economic_events": ["timestamp", "created_at"],
+    "users": ["created_at"],
+}
+
+# Key of the unique economic_events index the server creates on startup
+EVENT_KEY = ("event_name", "timestamp", "country")
+
+async def dedupe_events(database):
+    """Keep the most recently inserted event for each key and delete the rest"""
+    duplicates = database.economic_events.aggregate([
+        # ObjectIds grow with insertion time, so the last pushed id is the newest
+        {"$sort": {"_id": 1}},
+        {"$group": {
+            "_id": {field: f"${field}" for field in EVENT_KEY},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True)
+
+    removed = 0
+    async for group in duplicates:
+        result = await database.economic_events.delete_many({"_id": {"$in": group["ids"][:-1]}})
+        removed += result.deleted_count
+    print(f"economic_events: removed {removed} duplicate documents")
+
+async def migrate():
+    client = AsyncIOMotorClient(mongo_url)
+    database = client[db_name]
+
+    for collection, fields in DATE_FIELDS.items():
+        for field in fields:
+            result = await database[collection].update_many(
+                {field: {"$type": "string"}},
+                [{"$set": {field: {"$toDate": f"${field}"}}}]
+            )
+            print(f"{collection}.{field}: converted {result.modified_count} documents")
+
+    # Dates first, so string and Date copies of the same event group together
+    await dedupe_events(database)
+
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
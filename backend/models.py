@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, ConfigDict
+from dataclasses import dataclass
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
 import uuid
 
 class User(BaseModel):
@@ -10,7 +11,7 @@ class User(BaseModel):
     email: str
     password_hash: str
     name: str
-    created_at: datetime = Field(default_factory=lambda: datetime.utcnow())
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class UserCreate(BaseModel):
     email: str
@@ -22,6 +23,8 @@ class UserLogin(BaseModel):
     password: str
 
 class UserResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore", from_attributes=True, frozen=True)
+    
     id: str
     email: str
     name: str
@@ -44,11 +47,12 @@ class Trade(BaseModel):
     notes: Optional[str] = None
     strategy: Optional[str] = None
     screenshot_url: Optional[str] = None
+    screenshot_id: Optional[str] = None
     profit_loss: Optional[float] = None
     profit_loss_pct: Optional[float] = None
     risk_reward: Optional[float] = None
     tagged_events: List[str] = []
-    created_at: datetime = Field(default_factory=lambda: datetime.utcnow())
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class TradeCreate(BaseModel):
     currency_pair: str
@@ -64,6 +68,8 @@ class TradeCreate(BaseModel):
     strategy: Optional[str] = None
 
 class TradeResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore", from_attributes=True, frozen=True)
+    
     id: str
     user_id: str
     currency_pair: str
@@ -77,7 +83,7 @@ class TradeResponse(BaseModel):
     take_profit: Optional[float]
     notes: Optional[str]
     strategy: Optional[str]
-    screenshot_url: Optional[str]
+    screenshot_url: Optional[str] = None
     profit_loss: Optional[float]
     profit_loss_pct: Optional[float]
     risk_reward: Optional[float]
@@ -96,9 +102,11 @@ class EconomicEvent(BaseModel):
     previous: Optional[float] = None
     actual: Optional[float] = None
     affected_pairs: List[str] = []
-    created_at: datetime = Field(default_factory=lambda: datetime.utcnow())
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class EconomicEventResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore", from_attributes=True, frozen=True)
+    
     id: str
     event_name: str
     country: str
@@ -109,7 +117,8 @@ class EconomicEventResponse(BaseModel):
     actual: Optional[float]
     affected_pairs: List[str]
 
-class StatsResponse(BaseModel):
+@dataclass(slots=True, frozen=True)
+class StatsResponse:
     total_trades: int
     win_rate: float
     total_profit_loss: float
@@ -121,7 +130,8 @@ class StatsResponse(BaseModel):
     long_win_rate: float
     short_win_rate: float
 
-class EquityPoint(BaseModel):
+@dataclass(slots=True, frozen=True)
+class EquityPoint:
     date: str
     balance: float
     balance_pct: float
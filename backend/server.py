@@ -1,25 +1,40 @@
-from fastapi import FastAPI, APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
 from contextlib import asynccontextmanager
-from typing import List, Optional
-from datetime import datetime, timedelta
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Mapping, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
+from bisect import bisect_left, bisect_right
+import asyncio
 import os
+import re
+from types import MappingProxyType
 from pathlib import Path
 from dotenv import load_dotenv
-import base64
 import httpx
 from PIL import Image
+from pymongo import ReturnDocument, UpdateOne, WriteConcern
+from pymongo.errors import OperationFailure
+from gridfs.errors import NoFile
+from bson import ObjectId
 import io
+import orjson
+from pydantic import TypeAdapter
+from cachetools import TTLCache
 
 from models import (
     UserCreate, UserLogin, UserResponse, TokenResponse,
     TradeCreate, TradeResponse, Trade,
-    EconomicEventResponse, StatsResponse, EquityPoint
+    EconomicEvent, EconomicEventResponse, StatsResponse, EquityPoint
 )
 from auth import (
     get_password_hash, verify_password, create_access_token, get_current_user
 )
-from database import connect_to_mongo, close_mongo_connection, get_database
+from database import connect_to_mongo, close_mongo_connection, get_database, get_screenshot_bucket
+from analytics import EMPTY_STATS, INITIAL_BALANCE, compute_equity_curve, compute_stats
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -28,14 +43,83 @@ load_dotenv(ROOT_DIR / '.env')
 FINNHUB_API_KEY = os.environ.get("FINNHUB_API_KEY", "")
 ALPHA_VANTAGE_KEY = os.environ.get("ALPHA_VANTAGE_KEY", "")
 
+# Event names that mark an economic release as high impact. Plain substring
+# matches, like the original keyword scan, so variants such as "Interest
+# Rates", "CPIH", "GDPNow" and "Underemployment" stay high impact
+_HIGH_IMPACT_RE = re.compile(r'(?i)NFP|non[- ]?farm|FOMC|CPI|GDP|interest rate|employment')
+
+# Country code -> currency pairs moved by that country's releases
+_COUNTRY_PAIRS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "US": ("EURUSD", "GBPUSD", "USDJPY", "USDCAD", "AUDUSD", "NZDUSD"),
+    "EUR": ("EURUSD", "EURGBP", "EURJPY", "EURCHF"),
+    "GB": ("GBPUSD", "EURGBP", "GBPJPY"),
+    "JP": ("USDJPY", "EURJPY", "GBPJPY"),
+    "CA": ("USDCAD", "CADCHF"),
+    "AU": ("AUDUSD", "AUDJPY"),
+    "NZ": ("NZDUSD",),
+    "CH": ("USDCHF", "EURCHF"),
+})
+_EMPTY_PAIRS: Tuple[str, ...] = ()
+
+# Built once; validates a whole synced calendar in a single call
+_EVENT_LIST_ADAPTER = TypeAdapter(List[EconomicEvent])
+
+# Concurrent syncs of the same date range share one Finnhub fetch; results
+# are remembered briefly so a burst of syncs collapses to a single call.
+# Locks only live while a fetch is in flight and the cache is bounded, so
+# arbitrary client-chosen ranges cannot grow either without limit
+_SYNC_CACHE_TTL = 60  # seconds
+_sync_locks: Dict[Tuple[date, date], asyncio.Lock] = {}
+_sync_cache: TTLCache = TTLCache(maxsize=1024, ttl=_SYNC_CACHE_TTL)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Password hashing runs on the default executor
+    default_executor = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
+    asyncio.get_running_loop().set_default_executor(default_executor)
+    # Screenshot resampling gets its own small pool so a burst of large uploads
+    # cannot tie up the default executor that password hashing relies on
+    app.state.image_executor = ThreadPoolExecutor(
+        max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="screenshot"
+    )
     await connect_to_mongo()
+    # Shared outbound client so keep-alive connections and TLS sessions are reused
+    app.state.http = httpx.AsyncClient(
+        timeout=10.0,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+    )
     yield
+    await app.state.http.aclose()
+    app.state.image_executor.shutdown(wait=False)
+    default_executor.shutdown(wait=False)
     await close_mongo_connection()
 
-app = FastAPI(lifespan=lifespan)
-api_router = APIRouter(prefix="/api")
+class ORJSONRequest(Request):
+    """Request whose JSON body is decoded with orjson"""
+    async def json(self):
+        if not hasattr(self, "_json"):
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+class ORJSONRoute(APIRoute):
+    """Route that parses JSON request bodies with orjson before pydantic validation"""
+    def get_route_handler(self):
+        original_handler = super().get_route_handler()
+        
+        async def route_handler(request: Request):
+            return await original_handler(ORJSONRequest(request.scope, request.receive))
+        
+        return route_handler
+
+async def get_http_client(request: Request) -> httpx.AsyncClient:
+    return request.app.state.http
+
+async def get_image_executor(request: Request) -> ThreadPoolExecutor:
+    return request.app.state.image_executor
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+api_router = APIRouter(prefix="/api", default_response_class=ORJSONResponse, route_class=ORJSONRoute)
 
 # CORS
 app.add_middleware(
@@ -50,7 +134,7 @@ app.add_middleware(
 @api_router.post("/auth/register", response_model=TokenResponse, tags=["auth"])
 async def register(user_data: UserCreate, db=Depends(get_database)):
     # Check if user exists
-    existing_user = await db.users.find_one({"email": user_data.email})
+    existing_user = await db.users.find_one({"email": user_data.email}, {"_id": 1})
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
@@ -58,12 +142,11 @@ async def register(user_data: UserCreate, db=Depends(get_database)):
     from models import User
     user = User(
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await asyncio.to_thread(get_password_hash, user_data.password),
         name=user_data.name
     )
     
     user_dict = user.model_dump()
-    user_dict['created_at'] = user_dict['created_at'].isoformat()
     await db.users.insert_one(user_dict)
     
     # Create token
@@ -72,36 +155,31 @@ async def register(user_data: UserCreate, db=Depends(get_database)):
     return TokenResponse(
         access_token=access_token,
         token_type="bearer",
-        user=UserResponse(**user.model_dump())
+        # Built from our own validated User, so skip re-validation
+        user=UserResponse.model_construct(**user_dict)
     )
 
 @api_router.post("/auth/login", response_model=TokenResponse, tags=["auth"])
 async def login(credentials: UserLogin, db=Depends(get_database)):
     user = await db.users.find_one({"email": credentials.email}, {"_id": 0})
-    if not user or not verify_password(credentials.password, user["password_hash"]):
+    if not user or not await asyncio.to_thread(verify_password, credentials.password, user["password_hash"]):
         raise HTTPException(status_code=401, detail="Incorrect email or password")
     
-    if isinstance(user['created_at'], str):
-        user['created_at'] = datetime.fromisoformat(user['created_at'])
-    
     access_token = create_access_token(data={"sub": user["id"]})
     
     return TokenResponse(
         access_token=access_token,
         token_type="bearer",
-        user=UserResponse(**user)
+        user=UserResponse.model_construct(**user)
     )
 
 @api_router.get("/auth/me", response_model=UserResponse, tags=["auth"])
 async def get_me(user_id: str = Depends(get_current_user), db=Depends(get_database)):
-    user = await db.users.find_one({"id": user_id}, {"_id": 0})
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, "password_hash": 0})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    if isinstance(user['created_at'], str):
-        user['created_at'] = datetime.fromisoformat(user['created_at'])
-    
-    return UserResponse(**user)
+    return UserResponse.model_construct(**user)
 
 # Trade endpoints
 @api_router.post("/trades", response_model=TradeResponse, tags=["trades"])
@@ -110,42 +188,62 @@ async def create_trade(
     user_id: str = Depends(get_current_user),
     db=Depends(get_database)
 ):
-    trade = Trade(user_id=user_id, **trade_data.model_dump())
-    
-    # Calculate P&L if exit price exists
-    if trade.exit_price:
-        if trade.direction == "long":
-            trade.profit_loss = (trade.exit_price - trade.entry_price) * trade.lot_size * 100000
-            trade.profit_loss_pct = ((trade.exit_price - trade.entry_price) / trade.entry_price) * 100
-        else:
-            trade.profit_loss = (trade.entry_price - trade.exit_price) * trade.lot_size * 100000
-            trade.profit_loss_pct = ((trade.entry_price - trade.exit_price) / trade.entry_price) * 100
-        
-        # Calculate R:R
-        if trade.stop_loss:
-            risk = abs(trade.entry_price - trade.stop_loss) * trade.lot_size * 100000
-            if risk > 0:
-                trade.risk_reward = abs(trade.profit_loss) / risk
+    trade = build_trade(user_id, trade_data)
     
     # Tag with economic events
     trade.tagged_events = await tag_trade_with_events(trade.entry_time, db)
     
+    # Dump once and reuse it for the response; the extra _id that insert_one
+    # adds is ignored by model_construct
     trade_dict = trade.model_dump()
-    trade_dict['entry_time'] = trade_dict['entry_time'].isoformat()
-    if trade_dict['exit_time']:
-        trade_dict['exit_time'] = trade_dict['exit_time'].isoformat()
-    trade_dict['created_at'] = trade_dict['created_at'].isoformat()
-    
     await db.trades.insert_one(trade_dict)
+    await bump_trades_version(user_id, db)
     
-    return TradeResponse(**trade.model_dump())
+    return TradeResponse.model_construct(**trade_dict)
+
+MAX_BULK_TRADES = 500
 
-@api_router.get("/trades", response_model=List[TradeResponse], tags=["trades"])
+@api_router.post("/trades/bulk", response_model=List[TradeResponse], tags=["trades"])
+async def create_trades_bulk(
+    trades_data: List[TradeCreate],
+    user_id: str = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    if len(trades_data) > MAX_BULK_TRADES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_TRADES} trades per request")
+    if not trades_data:
+        return []
+    
+    trades = [build_trade(user_id, data) for data in trades_data]
+    
+    # One events query for the whole batch instead of one per trade
+    tagged = await tag_trades_with_events([trade.entry_time for trade in trades], db)
+    for trade, events in zip(trades, tagged):
+        trade.tagged_events = events
+    
+    await db.trades.insert_many([trade.model_dump() for trade in trades])
+    await bump_trades_version(user_id, db)
+    
+    return trades
+
+# Newest first, with id as the tiebreak the keyset cursor relies on
+TRADE_LIST_SORT = [("entry_time", -1), ("id", -1)]
+
+# List endpoints hand the stored documents straight to orjson instead of
+# re-validating every row; `responses` keeps the schema in the OpenAPI docs
+@api_router.get(
+    "/trades",
+    response_model=None,
+    responses={200: {"model": List[TradeResponse]}},
+    tags=["trades"]
+)
 async def get_trades(
     user_id: str = Depends(get_current_user),
     strategy: Optional[str] = None,
     currency_pair: Optional[str] = None,
     limit: int = Query(100, le=500),
+    before: Optional[datetime] = None,
+    before_id: Optional[str] = None,
     db=Depends(get_database)
 ):
     query = {"user_id": user_id}
@@ -153,18 +251,44 @@ async def get_trades(
         query["strategy"] = strategy
     if currency_pair:
         query["currency_pair"] = currency_pair
+    # Keyset pagination: pass the last entry_time and id of a page to fetch the
+    # next one, which stays an index seek however deep the client pages. The
+    # id breaks ties between trades entered at the same time (bulk imports)
+    if before and before_id:
+        query["$or"] = [
+            {"entry_time": {"$lt": before}},
+            {"entry_time": before, "id": {"$lt": before_id}}
+        ]
+    elif before:
+        query["entry_time"] = {"$lt": before}
+    
+    # Screenshots are only served from the single-trade endpoint
+    trades = await db.trades.find(
+        query, {"_id": 0, "screenshot_url": 0, "screenshot_id": 0}
+    ).sort(TRADE_LIST_SORT).limit(limit).to_list(limit)
     
-    trades = await db.trades.find(query, {"_id": 0}).sort("entry_time", -1).limit(limit).to_list(limit)
-    
-    for trade in trades:
-        if isinstance(trade.get('entry_time'), str):
-            trade['entry_time'] = datetime.fromisoformat(trade['entry_time'])
-        if trade.get('exit_time') and isinstance(trade['exit_time'], str):
-            trade['exit_time'] = datetime.fromisoformat(trade['exit_time'])
-        if isinstance(trade.get('created_at'), str):
-            trade['created_at'] = datetime.fromisoformat(trade['created_at'])
-    
-    return [TradeResponse(**trade) for trade in trades]
+    return ORJSONResponse(trades)
+
+@api_router.get("/trades/export", tags=["trades"])
+async def export_trades(
+    user_id: str = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    cursor = db.trades.find(
+        {"user_id": user_id}, {"_id": 0, "screenshot_url": 0, "screenshot_id": 0}
+    ).sort(TRADE_LIST_SORT)
+    
+    # One trade per line, encoded as the cursor yields it, so the full
+    # history is never held in memory at once
+    async def ndjson():
+        async for trade in cursor:
+            yield orjson.dumps(trade) + b"\n"
+    
+    return StreamingResponse(
+        ndjson(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="trades.ndjson"'}
+    )
 
 @api_router.get("/trades/{trade_id}", response_model=TradeResponse, tags=["trades"])
 async def get_trade(
@@ -176,14 +300,8 @@ async def get_trade(
     if not trade:
         raise HTTPException(status_code=404, detail="Trade not found")
     
-    if isinstance(trade.get('entry_time'), str):
-        trade['entry_time'] = datetime.fromisoformat(trade['entry_time'])
-    if trade.get('exit_time') and isinstance(trade['exit_time'], str):
-        trade['exit_time'] = datetime.fromisoformat(trade['exit_time'])
-    if isinstance(trade.get('created_at'), str):
-        trade['created_at'] = datetime.fromisoformat(trade['created_at'])
-    
-    return TradeResponse(**trade)
+    # Stored documents were validated on write; skip re-validating them on read
+    return TradeResponse.model_construct(**trade)
 
 @api_router.put("/trades/{trade_id}", response_model=TradeResponse, tags=["trades"])
 async def update_trade(
@@ -192,46 +310,45 @@ async def update_trade(
     user_id: str = Depends(get_current_user),
     db=Depends(get_database)
 ):
-    existing_trade = await db.trades.find_one({"id": trade_id, "user_id": user_id})
-    if not existing_trade:
-        raise HTTPException(status_code=404, detail="Trade not found")
-    
     update_data = trade_data.model_dump()
     
-    # Recalculate P&L
-    if update_data.get('exit_price'):
-        if update_data['direction'] == "long":
-            update_data['profit_loss'] = (update_data['exit_price'] - update_data['entry_price']) * update_data['lot_size'] * 100000
-            update_data['profit_loss_pct'] = ((update_data['exit_price'] - update_data['entry_price']) / update_data['entry_price']) * 100
-        else:
-            update_data['profit_loss'] = (update_data['entry_price'] - update_data['exit_price']) * update_data['lot_size'] * 100000
-            update_data['profit_loss_pct'] = ((update_data['entry_price'] - update_data['exit_price']) / update_data['entry_price']) * 100
-    
-    update_data['entry_time'] = update_data['entry_time'].isoformat()
-    if update_data.get('exit_time'):
-        update_data['exit_time'] = update_data['exit_time'].isoformat()
-    
-    await db.trades.update_one({"id": trade_id}, {"$set": update_data})
+    # Recalculate P&L and R:R so edits to the exit or stop never leave them stale
+    (
+        update_data['profit_loss'], update_data['profit_loss_pct'], update_data['risk_reward']
+    ) = calculate_profit_loss(
+        trade_data.direction, trade_data.entry_price, trade_data.exit_price,
+        trade_data.lot_size, trade_data.stop_loss
+    )
     
-    updated_trade = await db.trades.find_one({"id": trade_id}, {"_id": 0})
-    if isinstance(updated_trade['entry_time'], str):
-        updated_trade['entry_time'] = datetime.fromisoformat(updated_trade['entry_time'])
-    if updated_trade.get('exit_time') and isinstance(updated_trade['exit_time'], str):
-        updated_trade['exit_time'] = datetime.fromisoformat(updated_trade['exit_time'])
-    if isinstance(updated_trade.get('created_at'), str):
-        updated_trade['created_at'] = datetime.fromisoformat(updated_trade['created_at'])
+    # Ownership check, update and read-back in a single round trip
+    updated_trade = await db.trades.find_one_and_update(
+        {"id": trade_id, "user_id": user_id},
+        {"$set": update_data},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not updated_trade:
+        raise HTTPException(status_code=404, detail="Trade not found")
     
-    return TradeResponse(**updated_trade)
+    await bump_trades_version(user_id, db)
+    return TradeResponse.model_construct(**updated_trade)
 
 @api_router.delete("/trades/{trade_id}", tags=["trades"])
 async def delete_trade(
     trade_id: str,
     user_id: str = Depends(get_current_user),
-    db=Depends(get_database)
+    db=Depends(get_database),
+    bucket=Depends(get_screenshot_bucket)
 ):
-    result = await db.trades.delete_one({"id": trade_id, "user_id": user_id})
-    if result.deleted_count == 0:
+    trade = await db.trades.find_one_and_delete(
+        {"id": trade_id, "user_id": user_id},
+        projection={"_id": 0, "screenshot_id": 1}
+    )
+    if trade is None:
         raise HTTPException(status_code=404, detail="Trade not found")
+    
+    await bump_trades_version(user_id, db)
+    await delete_screenshot(bucket, trade.get("screenshot_id"))
     return {"message": "Trade deleted successfully"}
 
 @api_router.post("/trades/{trade_id}/upload-screenshot", tags=["trades"])
@@ -239,181 +356,232 @@ async def upload_screenshot(
     trade_id: str,
     file: UploadFile = File(...),
     user_id: str = Depends(get_current_user),
-    db=Depends(get_database)
+    db=Depends(get_database),
+    bucket=Depends(get_screenshot_bucket),
+    image_executor: ThreadPoolExecutor = Depends(get_image_executor)
 ):
     # Verify trade exists and belongs to user
-    trade = await db.trades.find_one({"id": trade_id, "user_id": user_id})
+    trade = await db.trades.find_one({"id": trade_id, "user_id": user_id}, {"_id": 1})
     if not trade:
         raise HTTPException(status_code=404, detail="Trade not found")
     
-    # Read and convert to base64
     contents = await file.read()
     
-    # Compress image
-    image = Image.open(io.BytesIO(contents))
-    if image.mode in ('RGBA', 'LA'):
-        image = image.convert('RGB')
+    # Decoding and resampling are CPU-bound; keep them off the event loop
+    jpeg_bytes = await asyncio.get_running_loop().run_in_executor(
+        image_executor, compress_screenshot, contents
+    )
     
-    # Resize if too large
-    max_size = (1200, 1200)
-    image.thumbnail(max_size, Image.Resampling.LANCZOS)
+    # Keep the image bytes in GridFS; the trade only stores where to fetch them
+    file_id = await bucket.upload_from_stream(
+        f"{trade_id}.jpg",
+        jpeg_bytes,
+        metadata={"trade_id": trade_id, "user_id": user_id}
+    )
+    screenshot_url = f"/api/trades/{trade_id}/screenshot"
+    
+    # Swap in the new file and read back the one it replaces in a single round
+    # trip, so concurrent uploads each clean up exactly the file they displaced
+    previous = await db.trades.find_one_and_update(
+        {"id": trade_id, "user_id": user_id},
+        {"$set": {"screenshot_url": screenshot_url, "screenshot_id": str(file_id)}},
+        projection={"_id": 0, "screenshot_id": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    if previous is None:
+        # Trade was deleted while the image was being processed
+        await delete_screenshot(bucket, str(file_id))
+        raise HTTPException(status_code=404, detail="Trade not found")
+    await delete_screenshot(bucket, previous.get("screenshot_id"))
     
-    # Save to bytes
-    output = io.BytesIO()
-    image.save(output, format='JPEG', quality=85)
-    output.seek(0)
+    return {"message": "Screenshot uploaded successfully", "screenshot_url": screenshot_url}
+
+@api_router.get("/trades/{trade_id}/screenshot", tags=["trades"])
+async def get_screenshot(
+    trade_id: str,
+    user_id: str = Depends(get_current_user),
+    db=Depends(get_database),
+    bucket=Depends(get_screenshot_bucket)
+):
+    trade = await db.trades.find_one({"id": trade_id, "user_id": user_id}, {"_id": 0, "screenshot_id": 1})
+    if trade is None:
+        raise HTTPException(status_code=404, detail="Trade not found")
+    if not trade.get("screenshot_id"):
+        raise HTTPException(status_code=404, detail="Screenshot not found")
     
-    base64_image = base64.b64encode(output.read()).decode('utf-8')
-    screenshot_url = f"data:image/jpeg;base64,{base64_image}"
+    try:
+        grid_out = await bucket.open_download_stream(ObjectId(trade["screenshot_id"]))
+    except NoFile:
+        raise HTTPException(status_code=404, detail="Screenshot not found")
     
-    await db.trades.update_one({"id": trade_id}, {"$set": {"screenshot_url": screenshot_url}})
+    async def stream_chunks():
+        while chunk := await grid_out.readchunk():
+            yield chunk
     
-    return {"message": "Screenshot uploaded successfully", "screenshot_url": screenshot_url}
+    return StreamingResponse(stream_chunks(), media_type="image/jpeg")
 
 # Analytics endpoints
 @api_router.get("/analytics/stats", response_model=StatsResponse, tags=["analytics"])
 async def get_stats(
+    request: Request,
+    response: Response,
     user_id: str = Depends(get_current_user),
     db=Depends(get_database)
 ):
-    trades = await db.trades.find({"user_id": user_id, "exit_price": {"$ne": None}}, {"_id": 0}).to_list(1000)
-    
-    if not trades:
-        return StatsResponse(
-            total_trades=0,
-            win_rate=0,
-            total_profit_loss=0,
-            total_profit_loss_pct=0,
-            average_win=0,
-            average_loss=0,
-            best_trade=0,
-            worst_trade=0,
-            long_win_rate=0,
-            short_win_rate=0
-        )
+    etag = await analytics_etag(user_id, db)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=analytics_cache_headers(etag))
+    response.headers.update(analytics_cache_headers(etag))
+    
+    # Reduce all closed trades to a single StatsResponse-shaped document server-side
+    is_win = {"$gt": ["$profit_loss", 0]}
+    is_long = {"$eq": ["$direction", "long"]}
+    is_short = {"$eq": ["$direction", "short"]}
+    closed_trades = {"user_id": user_id, "exit_price": {"$ne": None}}
+    projection = {"_id": 0, "profit_loss": 1, "profit_loss_pct": 1, "direction": 1}
+    
+    def pct_of(part: str, whole: str) -> dict:
+        return {"$cond": [
+            {"$gt": [whole, 0]},
+            {"$multiply": [{"$divide": [part, whole]}, 100]},
+            0
+        ]}
     
-    total_trades = len(trades)
-    wins = [t for t in trades if t.get('profit_loss', 0) > 0]
-    losses = [t for t in trades if t.get('profit_loss', 0) <= 0]
-    
-    longs = [t for t in trades if t['direction'] == 'long']
-    shorts = [t for t in trades if t['direction'] == 'short']
-    long_wins = [t for t in longs if t.get('profit_loss', 0) > 0]
-    short_wins = [t for t in shorts if t.get('profit_loss', 0) > 0]
-    
-    return StatsResponse(
-        total_trades=total_trades,
-        win_rate=(len(wins) / total_trades * 100) if total_trades > 0 else 0,
-        total_profit_loss=sum(t.get('profit_loss', 0) for t in trades),
-        total_profit_loss_pct=sum(t.get('profit_loss_pct', 0) for t in trades),
-        average_win=sum(t.get('profit_loss', 0) for t in wins) / len(wins) if wins else 0,
-        average_loss=sum(t.get('profit_loss', 0) for t in losses) / len(losses) if losses else 0,
-        best_trade=max((t.get('profit_loss', 0) for t in trades), default=0),
-        worst_trade=min((t.get('profit_loss', 0) for t in trades), default=0),
-        long_win_rate=(len(long_wins) / len(longs) * 100) if longs else 0,
-        short_win_rate=(len(short_wins) / len(shorts) * 100) if shorts else 0
-    )
+    try:
+        results = await db.trades.aggregate([
+            {"$match": closed_trades},
+            {"$project": projection},
+            {"$group": {
+                "_id": None,
+                "total_trades": {"$sum": 1},
+                "total_profit_loss": {"$sum": "$profit_loss"},
+                "total_profit_loss_pct": {"$sum": "$profit_loss_pct"},
+                # $avg skips the nulls, so each average only sees its own side
+                "average_win": {"$avg": {"$cond": [is_win, "$profit_loss", None]}},
+                "average_loss": {"$avg": {"$cond": [is_win, None, {"$ifNull": ["$profit_loss", 0]}]}},
+                "best_trade": {"$max": "$profit_loss"},
+                "worst_trade": {"$min": "$profit_loss"},
+                "wins": {"$sum": {"$cond": [is_win, 1, 0]}},
+                "longs": {"$sum": {"$cond": [is_long, 1, 0]}},
+                "long_wins": {"$sum": {"$cond": [{"$and": [is_long, is_win]}, 1, 0]}},
+                "shorts": {"$sum": {"$cond": [is_short, 1, 0]}},
+                "short_wins": {"$sum": {"$cond": [{"$and": [is_short, is_win]}, 1, 0]}},
+            }},
+            {"$project": {
+                "_id": 0,
+                "total_trades": 1,
+                "win_rate": pct_of("$wins", "$total_trades"),
+                "total_profit_loss": 1,
+                "total_profit_loss_pct": 1,
+                "average_win": {"$ifNull": ["$average_win", 0]},
+                "average_loss": {"$ifNull": ["$average_loss", 0]},
+                "best_trade": {"$ifNull": ["$best_trade", 0]},
+                "worst_trade": {"$ifNull": ["$worst_trade", 0]},
+                "long_win_rate": pct_of("$long_wins", "$longs"),
+                "short_win_rate": pct_of("$short_wins", "$shorts"),
+            }}
+        ]).to_list(1)
+    except OperationFailure:
+        # Mongo-compatible servers without full aggregation support: reduce
+        # the projected trades here instead
+        trades = await db.trades.find(closed_trades, projection).to_list(1000)
+        return compute_stats(trades)
+    
+    return StatsResponse(**results[0]) if results else EMPTY_STATS
 
-@api_router.get("/analytics/equity-curve", response_model=List[EquityPoint], tags=["analytics"])
+@api_router.get(
+    "/analytics/equity-curve",
+    response_model=None,
+    responses={200: {"model": List[EquityPoint]}},
+    tags=["analytics"]
+)
 async def get_equity_curve(
+    request: Request,
     user_id: str = Depends(get_current_user),
     db=Depends(get_database)
 ):
-    trades = await db.trades.find(
-        {"user_id": user_id, "exit_price": {"$ne": None}},
-        {"_id": 0}
-    ).sort("exit_time", 1).to_list(1000)
-    
-    if not trades:
-        return []
-    
-    equity_curve = []
-    cumulative_pl = 0
-    initial_balance = 10000  # Default starting balance
+    etag = await analytics_etag(user_id, db)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=analytics_cache_headers(etag))
     
-    for trade in trades:
-        cumulative_pl += trade.get('profit_loss', 0)
-        current_balance = initial_balance + cumulative_pl
-        
-        exit_time = trade.get('exit_time')
-        if isinstance(exit_time, str):
-            exit_time = datetime.fromisoformat(exit_time)
-        
-        equity_curve.append(EquityPoint(
-            date=exit_time.strftime('%Y-%m-%d') if exit_time else '',
-            balance=current_balance,
-            balance_pct=(cumulative_pl / initial_balance) * 100
-        ))
+    closed_trades = {"user_id": user_id, "exit_price": {"$ne": None}}
+    projection = {"_id": 0, "profit_loss": 1, "exit_time": 1}
     
-    return equity_curve
+    try:
+        # Running P&L is accumulated server-side and projected straight into EquityPoint shape
+        equity_curve = await db.trades.aggregate([
+            {"$match": closed_trades},
+            {"$project": projection},
+            {"$sort": {"exit_time": 1}},
+            {"$setWindowFields": {
+                "sortBy": {"exit_time": 1},
+                "output": {
+                    "cum_pl": {
+                        "$sum": {"$ifNull": ["$profit_loss", 0]},
+                        "window": {"documents": ["unbounded", "current"]}
+                    }
+                }
+            }},
+            {"$project": {
+                "_id": 0,
+                "date": {"$dateToString": {
+                    "format": "%Y-%m-%d",
+                    "date": "$exit_time",
+                    "onNull": ""
+                }},
+                "balance": {"$add": [INITIAL_BALANCE, "$cum_pl"]},
+                "balance_pct": {"$multiply": [{"$divide": ["$cum_pl", INITIAL_BALANCE]}, 100]}
+            }}
+        ]).to_list(1000)
+    except OperationFailure:
+        # $setWindowFields needs MongoDB 5.0+; accumulate the curve here otherwise
+        trades = await db.trades.find(closed_trades, projection).sort("exit_time", 1).to_list(1000)
+        equity_curve = compute_equity_curve(trades)
+    
+    return ORJSONResponse(equity_curve, headers=analytics_cache_headers(etag))
 
 # Economic events endpoints
 @api_router.post("/events/sync", tags=["events"])
 async def sync_economic_events(
-    from_date: str = Query(..., description="YYYY-MM-DD"),
-    to_date: str = Query(..., description="YYYY-MM-DD"),
+    from_date: date = Query(..., description="YYYY-MM-DD"),
+    to_date: date = Query(..., description="YYYY-MM-DD"),
     user_id: str = Depends(get_current_user),
-    db=Depends(get_database)
+    db=Depends(get_database),
+    client: httpx.AsyncClient = Depends(get_http_client)
 ):
     if not FINNHUB_API_KEY:
         return {"message": "Finnhub API key not configured", "events_synced": 0}
     
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://finnhub.io/api/v1/calendar/economic",
-                params={"from": from_date, "to": to_date, "token": FINNHUB_API_KEY},
-                timeout=10.0
-            )
-            
-            if response.status_code != 200:
-                raise HTTPException(status_code=response.status_code, detail="Failed to fetch events from Finnhub")
-            
-            data = response.json()
-            events_data = data.get('economicCalendar', [])
-            
-            if not events_data:
-                return {"message": "No events found", "events_synced": 0}
-            
-            high_impact_keywords = ['NFP', 'Non-Farm', 'FOMC', 'CPI', 'GDP', 'Interest Rate', 'Employment']
-            
-            from models import EconomicEvent
-            events_to_insert = []
-            
-            for event in events_data:
-                event_name = event.get('event', '')
-                impact = 'low'
-                
-                for keyword in high_impact_keywords:
-                    if keyword.lower() in event_name.lower():
-                        impact = 'high'
-                        break
-                
-                event_obj = EconomicEvent(
-                    event_name=event_name,
-                    country=event.get('country', ''),
-                    timestamp=datetime.fromisoformat(event.get('time', datetime.utcnow().isoformat())),
-                    impact_level=impact,
-                    forecast=event.get('estimate'),
-                    previous=event.get('prev'),
-                    actual=event.get('actual'),
-                    affected_pairs=get_affected_pairs(event.get('country', ''))
-                )
-                
-                event_dict = event_obj.model_dump()
-                event_dict['timestamp'] = event_dict['timestamp'].isoformat()
-                event_dict['created_at'] = event_dict['created_at'].isoformat()
-                events_to_insert.append(event_dict)
-            
-            if events_to_insert:
-                await db.economic_events.insert_many(events_to_insert)
-            
-            return {"message": f"Synced {len(events_to_insert)} events", "events_synced": len(events_to_insert)}
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    key = (from_date, to_date)
+    events_synced = _sync_cache.get(key)
+    if events_synced is None:
+        lock = _sync_locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                # Another request may have finished this sync while we waited
+                events_synced = _sync_cache.get(key)
+                if events_synced is None:
+                    try:
+                        events_synced = await fetch_and_store_events(
+                            client, from_date.isoformat(), to_date.isoformat(), db
+                        )
+                    except Exception as e:
+                        raise HTTPException(status_code=500, detail=str(e))
+                    _sync_cache[key] = events_synced
+        finally:
+            if _sync_locks.get(key) is lock:
+                del _sync_locks[key]
+    
+    if not events_synced:
+        return {"message": "No events found", "events_synced": 0}
+    return {"message": f"Synced {events_synced} events", "events_synced": events_synced}
 
-@api_router.get("/events/high-impact", response_model=List[EconomicEventResponse], tags=["events"])
+@api_router.get(
+    "/events/high-impact",
+    response_model=None,
+    responses={200: {"model": List[EconomicEventResponse]}},
+    tags=["events"]
+)
 async def get_high_impact_events(
     days: int = Query(7, le=30),
     user_id: str = Depends(get_current_user),
@@ -421,22 +589,21 @@ async def get_high_impact_events(
 ):
     start_date = datetime.utcnow() - timedelta(days=days)
     
+    # Native Date range on the (impact_level, timestamp) index prefix, so the
+    # scan stops at the look-back window instead of walking every high event
     events = await db.economic_events.find(
-        {"impact_level": "high"},
-        {"_id": 0}
+        {"impact_level": "high", "timestamp": {"$gte": start_date}},
+        {"_id": 0, "created_at": 0}
     ).sort("timestamp", -1).limit(50).to_list(50)
     
-    for event in events:
-        if isinstance(event.get('timestamp'), str):
-            event['timestamp'] = datetime.fromisoformat(event['timestamp'])
-    
-    return [EconomicEventResponse(**event) for event in events]
+    return ORJSONResponse(events)
 
 # Forex price endpoint
 @api_router.get("/forex/price/{symbol}", tags=["forex"])
 async def get_forex_price(
     symbol: str,
-    user_id: str = Depends(get_current_user)
+    user_id: str = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(get_http_client)
 ):
     if not ALPHA_VANTAGE_KEY:
         return {"symbol": symbol, "price": None, "message": "Alpha Vantage API key not configured"}
@@ -446,39 +613,87 @@ async def get_forex_price(
         from_currency = symbol[:3]
         to_currency = symbol[3:]
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://www.alphavantage.co/query",
-                params={
-                    "function": "CURRENCY_EXCHANGE_RATE",
-                    "from_currency": from_currency,
-                    "to_currency": to_currency,
-                    "apikey": ALPHA_VANTAGE_KEY
-                },
-                timeout=10.0
-            )
-            
-            if response.status_code != 200:
-                raise HTTPException(status_code=response.status_code, detail="Failed to fetch forex price")
-            
-            data = response.json()
-            
-            if "Realtime Currency Exchange Rate" in data:
-                rate_data = data["Realtime Currency Exchange Rate"]
-                return {
-                    "symbol": symbol,
-                    "price": float(rate_data.get("5. Exchange Rate", 0)),
-                    "bid": float(rate_data.get("8. Bid Price", 0)),
-                    "ask": float(rate_data.get("9. Ask Price", 0)),
-                    "timestamp": rate_data.get("6. Last Refreshed")
-                }
-            else:
-                return {"symbol": symbol, "price": None, "message": "Price data not available"}
-    
+        response = await client.get(
+            "https://www.alphavantage.co/query",
+            params={
+                "function": "CURRENCY_EXCHANGE_RATE",
+                "from_currency": from_currency,
+                "to_currency": to_currency,
+                "apikey": ALPHA_VANTAGE_KEY
+            },
+            timeout=10.0
+        )
+        
+        if response.status_code != 200:
+            raise HTTPException(status_code=response.status_code, detail="Failed to fetch forex price")
+        
+        data = orjson.loads(response.content)
+        
+        if "Realtime Currency Exchange Rate" in data:
+            rate_data = data["Realtime Currency Exchange Rate"]
+            return {
+                "symbol": symbol,
+                "price": float(rate_data.get("5. Exchange Rate", 0)),
+                "bid": float(rate_data.get("8. Bid Price", 0)),
+                "ask": float(rate_data.get("9. Ask Price", 0)),
+                "timestamp": rate_data.get("6. Last Refreshed")
+            }
+        else:
+            return {"symbol": symbol, "price": None, "message": "Price data not available"}
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Helper functions
+def build_trade(user_id: str, trade_data: TradeCreate) -> Trade:
+    """Create a Trade with its P&L and R:R filled in"""
+    trade = Trade(user_id=user_id, **trade_data.model_dump())
+    
+    # Calculate P&L and R:R if exit price exists
+    trade.profit_loss, trade.profit_loss_pct, trade.risk_reward = calculate_profit_loss(
+        trade.direction, trade.entry_price, trade.exit_price, trade.lot_size, trade.stop_loss
+    )
+    return trade
+
+def calculate_profit_loss(
+    direction: str, entry_price: float, exit_price: Optional[float], lot_size: float,
+    stop_loss: Optional[float] = None
+) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    """Return (profit_loss, profit_loss_pct, risk_reward) for a closed trade, or all None while it is open"""
+    if not exit_price:
+        return None, None, None
+    
+    price_move = exit_price - entry_price if direction == "long" else entry_price - exit_price
+    profit_loss = price_move * lot_size * 100000
+    
+    risk_reward = None
+    if stop_loss:
+        risk = abs(entry_price - stop_loss) * lot_size * 100000
+        if risk > 0:
+            risk_reward = abs(profit_loss) / risk
+    
+    return profit_loss, (price_move / entry_price) * 100, risk_reward
+
+async def bump_trades_version(user_id: str, db):
+    """Invalidate the user's cached analytics after a trade write"""
+    await db.users.update_one({"id": user_id}, {"$inc": {"trades_version": 1}})
+
+async def analytics_etag(user_id: str, db) -> str:
+    """Weak ETag for analytics derived from the user's current trades"""
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, "trades_version": 1})
+    version = user.get("trades_version", 0) if user else 0
+    return f'W/"{user_id}:{version}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+
+def analytics_cache_headers(etag: str) -> Dict[str, str]:
+    # Clients must revalidate every time, but a match costs one indexed read
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
 async def tag_trade_with_events(entry_time: datetime, db) -> List[str]:
     """Find economic events within 30 minutes of trade entry"""
     time_window_start = entry_time - timedelta(minutes=30)
@@ -487,29 +702,137 @@ async def tag_trade_with_events(entry_time: datetime, db) -> List[str]:
     events = await db.economic_events.find(
         {
             "timestamp": {
-                "$gte": time_window_start.isoformat(),
-                "$lte": time_window_end.isoformat()
+                "$gte": time_window_start,
+                "$lte": time_window_end
             },
             "impact_level": "high"
         },
-        {"_id": 0}
+        # Covered by the (impact_level, timestamp, event_name) index
+        {"_id": 0, "event_name": 1}
     ).to_list(10)
     
     return [event.get('event_name', '') for event in events]
 
-def get_affected_pairs(country: str) -> List[str]:
+async def tag_trades_with_events(entry_times: List[datetime], db) -> List[List[str]]:
+    """Tag a batch of trades with one events query over the whole entry-time span"""
+    window = timedelta(minutes=30)
+    # Stored timestamps come back as aware UTC, so compare against aware UTC
+    # too; naive entry times are taken to be UTC already
+    entry_times = [
+        t.astimezone(timezone.utc) if t.tzinfo else t.replace(tzinfo=timezone.utc)
+        for t in entry_times
+    ]
+    
+    events = await db.economic_events.find(
+        {
+            "timestamp": {
+                "$gte": min(entry_times) - window,
+                "$lte": max(entry_times) + window
+            },
+            "impact_level": "high"
+        },
+        {"_id": 0, "event_name": 1, "timestamp": 1}
+    ).sort("timestamp", 1).to_list(None)
+    timestamps = [event['timestamp'] for event in events]
+    
+    tagged = []
+    for entry_time in entry_times:
+        lo = bisect_left(timestamps, entry_time - window)
+        hi = min(bisect_right(timestamps, entry_time + window), lo + 10)
+        tagged.append([event.get('event_name', '') for event in events[lo:hi]])
+    return tagged
+
+async def fetch_and_store_events(client: httpx.AsyncClient, from_date: str, to_date: str, db) -> int:
+    """Pull the Finnhub economic calendar for a date range and store it; returns the event count"""
+    response = await client.get(
+        "https://finnhub.io/api/v1/calendar/economic",
+        params={"from": from_date, "to": to_date, "token": FINNHUB_API_KEY},
+        timeout=10.0
+    )
+    
+    if response.status_code != 200:
+        raise HTTPException(status_code=response.status_code, detail="Failed to fetch events from Finnhub")
+    
+    # The calendar payload can be large; decode it with orjson like our own bodies
+    data = orjson.loads(response.content)
+    events_data = data.get('economicCalendar', [])
+    
+    if not events_data:
+        return 0
+    
+    raw_events = []
+    for event in events_data:
+        event_name = event.get('event', '')
+        
+        raw_events.append({
+            "event_name": event_name,
+            "country": event.get('country', ''),
+            "timestamp": event.get('time', datetime.utcnow()),
+            "impact_level": classify_impact(event_name),
+            "forecast": event.get('estimate'),
+            "previous": event.get('prev'),
+            "actual": event.get('actual'),
+            "affected_pairs": get_affected_pairs(event.get('country', ''))
+        })
+    
+    events = _EVENT_LIST_ADAPTER.dump_python(_EVENT_LIST_ADAPTER.validate_python(raw_events))
+    
+    # Upsert on the unique (event_name, timestamp, country) key so re-syncing an
+    # overlapping range refreshes released figures instead of duplicating events
+    operations = []
+    for event in events:
+        key = {field: event.pop(field) for field in ("event_name", "timestamp", "country")}
+        # Figures and derived classification are refreshed on every sync, so
+        # a re-sync also corrects events stored under older rules
+        updates = {
+            field: event.pop(field)
+            for field in ("forecast", "previous", "actual", "impact_level", "affected_pairs")
+        }
+        operations.append(UpdateOne(key, {"$set": updates, "$setOnInsert": event}, upsert=True))
+    
+    # Unacknowledged, unordered writes: one failing upsert doesn't abort the batch
+    events_coll = db.economic_events.with_options(write_concern=WriteConcern(w=0))
+    batch_size = 1000  # keeps each bulk write well under the 16 MB message cap
+    for i in range(0, len(operations), batch_size):
+        await events_coll.bulk_write(operations[i:i + batch_size], ordered=False)
+    
+    return len(operations)
+
+async def delete_screenshot(bucket, screenshot_id: Optional[str]):
+    """Remove a stored screenshot from GridFS, ignoring ones that are already gone"""
+    if not screenshot_id:
+        return
+    try:
+        await bucket.delete(ObjectId(screenshot_id))
+    except NoFile:
+        pass
+
+def compress_screenshot(contents: bytes) -> bytes:
+    """Downscale an uploaded image to fit 1200x1200 and re-encode it as JPEG"""
+    max_size = (1200, 1200)
+    
+    image = Image.open(io.BytesIO(contents))
+    # For JPEG sources, let the decoder skip detail we would discard on resize
+    image.draft('RGB', max_size)
+    if image.mode in ('RGBA', 'LA'):
+        image = image.convert('RGB')
+    
+    image.thumbnail(max_size, Image.Resampling.LANCZOS)
+    
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=85)
+    return output.getvalue()
+
+# Calendar releases repeat the same names every period, so a month of events
+# only needs a regex scan per distinct name
+@lru_cache(maxsize=4096)
+def classify_impact(event_name: str) -> str:
+    """Classify an economic event as 'high' or 'low' impact from its name"""
+    return 'high' if _HIGH_IMPACT_RE.search(event_name) else 'low'
+
+def get_affected_pairs(country: str) -> Tuple[str, ...]:
     """Map country codes to affected currency pairs"""
-    country_pairs = {
-        "US": ["EURUSD", "GBPUSD", "USDJPY", "USDCAD", "AUDUSD", "NZDUSD"],
-        "EUR": ["EURUSD", "EURGBP", "EURJPY", "EURCHF"],
-        "GB": ["GBPUSD", "EURGBP", "GBPJPY"],
-        "JP": ["USDJPY", "EURJPY", "GBPJPY"],
-        "CA": ["USDCAD", "CADCHF"],
-        "AU": ["AUDUSD", "AUDJPY"],
-        "NZ": ["NZDUSD"],
-        "CH": ["USDCHF", "EURCHF"]
-    }
-    return country_pairs.get(country, [])
+    return _COUNTRY_PAIRS.get(country, _EMPTY_PAIRS)
 
 app.include_router(api_router)
 
@@ -13,11 +13,47 @@ export default function TradeDetail() {
   const navigate = useNavigate();
   const [trade, setTrade] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [screenshotSrc, setScreenshotSrc] = useState(null);
 
   useEffect(() => {
     fetchTrade();
   }, [id]);
 
+  useEffect(() => {
+    // Never keep showing the previous trade's image
+    setScreenshotSrc(null);
+    if (!trade?.screenshot_url) return;
+
+    // Older trades still carry the image inline as a data URL
+    if (trade.screenshot_url.startsWith('data:')) {
+      setScreenshotSrc(trade.screenshot_url);
+      return;
+    }
+
+    // The screenshot endpoint needs the auth header, so load it as a blob
+    let cancelled = false;
+    let objectUrl;
+    api.get(`/trades/${trade.id}/screenshot`, { responseType: 'blob' })
+      .then((response) => {
+        const url = URL.createObjectURL(response.data);
+        if (cancelled) {
+          // The effect was cleaned up while the request was in flight
+          URL.revokeObjectURL(url);
+          return;
+        }
+        objectUrl = url;
+        setScreenshotSrc(url);
+      })
+      .catch(() => {
+        if (!cancelled) toast.error('Failed to load screenshot');
+      });
+
+    return () => {
+      cancelled = true;
+      if (objectUrl) URL.revokeObjectURL(objectUrl);
+    };
+  }, [trade]);
+
   const fetchTrade = async () => {
     try {
       const response = await api.get(`/trades/${id}`);
@@ -199,14 +235,14 @@ export default function TradeDetail() {
       </div>
 
       {/* Screenshot */}
-      {trade.screenshot_url && (
+      {screenshotSrc && (
         <Card className="border-border/50">
           <CardHeader>
             <CardTitle className="font-heading">Screenshot</CardTitle>
           </CardHeader>
           <CardContent>
             <img 
-              src={trade.screenshot_url} 
+              src={screenshotSrc} 
               alt="Trade screenshot" 
               className="w-full rounded-lg border border-border/50"
               data-testid="trade-screenshot"